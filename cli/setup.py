@@ -9,6 +9,9 @@ setup(
         "typer",
         "rich"
     ],
+    extras_require={
+        "fast": ["orjson"]
+    },
     entry_points={
         "console_scripts": [
             "vscode-sync = vscode_sync.main:app"
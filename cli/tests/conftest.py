@@ -0,0 +1,68 @@
+import subprocess
+
+import pytest
+from typer.testing import CliRunner
+
+from vscode_sync import _json, config, main
+
+
+@pytest.fixture(scope="session")
+def runner():
+    return CliRunner()
+
+
+class FakeCli:  # pylint: disable=too-few-public-methods
+    """Stand-in for subprocess.run that records each IDE CLI argv and replies with canned output."""
+
+    def __init__(self):
+        self.calls = []
+        self.timeouts = []
+        self.stdout = b""
+        self.stderr = b""
+        self.returncode = 0
+        # Optional callable(argv) -> return code, for replies that depend on the command; it may raise.
+        self.respond = None
+
+    def run(self, argv, **kwargs):
+        self.calls.append(argv)
+        self.timeouts.append(kwargs.get("timeout"))
+        returncode = self.respond(argv) if self.respond else self.returncode
+        return subprocess.CompletedProcess(argv, returncode, self.stdout, self.stderr)
+
+
+@pytest.fixture
+def fake_cli(monkeypatch):
+    """Select a validated 'code' CLI and route its subprocess calls to a FakeCli."""
+    cli = FakeCli()
+    monkeypatch.setattr(main, "check_cli_tools", lambda: True)
+    monkeypatch.setattr(main, "IDE_CHOICE", "code")
+    monkeypatch.setattr(main.subprocess, "run", cli.run)
+    return cli
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    """Run a test with orjson (skipped when it is not installed) and with the stdlib fallback."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(_json, "orjson", None)
+    return request.param
+
+
+@pytest.fixture(autouse=True)
+def no_extensions_dir(monkeypatch):
+    """Keep tests away from the developer's real IDE extensions folder."""
+    monkeypatch.setattr(config, "get_extensions_dir", lambda ide: None)
+
+
+@pytest.fixture(autouse=True)
+def no_ide_on_path(monkeypatch):
+    """Resolve IDE CLIs as if none were installed, whatever the developer's PATH holds."""
+    # pylint: disable=protected-access
+    monkeypatch.setattr(main.shutil, "which", lambda name: None)
+    main._reset_cli_cache()
+    main._reset_cli_validated()
+    yield
+    main._reset_cli_cache()
+    main._reset_cli_validated()
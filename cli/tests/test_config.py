@@ -1,20 +1,45 @@
 import sys
 import os
 from pathlib import Path
+import pytest
 from vscode_sync import config
 
 
+# Held here because tests monkeypatch the module attributes with uncached lambdas.
+CACHED_LOOKUPS = (config.get_os, config.get_vscode_settings_path)
+get_extensions_dir = config.get_extensions_dir
+
+
+@pytest.fixture(autouse=True)
+def clear_config_caches():
+    for lookup in CACHED_LOOKUPS:
+        lookup.cache_clear()
+    yield
+    for lookup in CACHED_LOOKUPS:
+        lookup.cache_clear()
+
+
 def test_get_os(monkeypatch):
     monkeypatch.setattr(sys, "platform", "darwin")
     assert config.get_os() == "macos"
+    config.get_os.cache_clear()
     monkeypatch.setattr(sys, "platform", "win32")
     assert config.get_os() == "windows"
+    config.get_os.cache_clear()
     monkeypatch.setattr(sys, "platform", "linux")
     assert config.get_os() == "linux"
+    config.get_os.cache_clear()
     monkeypatch.setattr(sys, "platform", "somerandomos")
     assert config.get_os() == "unknown"
 
 
+def test_get_os_is_cached(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "darwin")
+    assert config.get_os() == "macos"
+    monkeypatch.setattr(sys, "platform", "linux")
+    assert config.get_os() == "macos"
+
+
 def test_get_vscode_settings_path_macos(monkeypatch):
     monkeypatch.setattr(config, "get_os", lambda: "macos")
     path = config.get_vscode_settings_path()
@@ -49,3 +74,12 @@ def test_get_vscode_settings_path_unknown(monkeypatch):
     monkeypatch.setattr(config, "get_os", lambda: "unknown")
     path = config.get_vscode_settings_path()
     assert path is None
+
+
+def test_get_extensions_dir_honours_override(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("VSCODE_EXTENSIONS", raising=False)
+    assert get_extensions_dir("code") == tmp_path / ".vscode/extensions"
+    monkeypatch.setenv("VSCODE_EXTENSIONS", str(tmp_path / "portable"))
+    assert get_extensions_dir("code") == tmp_path / "portable"
+    assert get_extensions_dir("cursor") == tmp_path / ".cursor/extensions"
@@ -0,0 +1,23 @@
+import pytest
+
+from vscode_sync import _json
+
+pytestmark = pytest.mark.usefixtures("json_backend")
+
+
+def test_dumps_is_indented_utf8_with_trailing_newline():
+    data = _json.dumps({"editor.fontFamily": "Fira Código", "files.exclude": ["*.pyc"]})
+    assert isinstance(data, bytes)
+    assert data.endswith(b"}\n")
+    assert b'\n  "editor.fontFamily": "Fira C\xc3\xb3digo"' in data
+
+
+def test_dumps_compact_has_no_whitespace():
+    data = _json.dumps({"editor.fontSize": 14, "files.exclude": ["*.pyc"]}, pretty=False)
+    assert data == b'{"editor.fontSize":14,"files.exclude":["*.pyc"]}\n'
+
+
+def test_loads_round_trips_bytes_and_str():
+    data = {"editor.fontSize": 14, "extensions": ["ms-python.python"]}
+    assert _json.loads(_json.dumps(data)) == data
+    assert _json.loads(_json.dumps(data).decode("utf-8")) == data
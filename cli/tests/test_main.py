@@ -1,13 +1,17 @@
 import json
-import builtins
+import os
+import subprocess
+import sys
+import tempfile
 import zipfile
 from pathlib import Path
-from typer.testing import CliRunner
-from vscode_sync.main import app
+import pytest
+import typer
+from vscode_sync import main
+from vscode_sync.main import INSTALL_TIMEOUT, app, import_
 
 
-def test_cli_commands_exist():
-    runner = CliRunner()
+def test_cli_commands_exist(runner):
     result = runner.invoke(app, ["--help"])
     assert result.exit_code == 0
     assert "VSCode Sync Tool" in result.output
@@ -15,16 +19,9 @@ def test_cli_commands_exist():
         assert command.replace("_", "-") in result.output or command in result.output
 
 
-def test_export_and_import(tmp_path, monkeypatch):
-    runner = CliRunner()
-    monkeypatch.setattr("vscode_sync.main.check_cli_tools", lambda: True)
-    monkeypatch.setattr("vscode_sync.main.IDE_CHOICE", "code")
-    monkeypatch.setattr(
-        "vscode_sync.main.subprocess.run",
-        lambda *a, **kw: type(
-            "Result", (), {"stdout": "ms-python.python\neamodio.gitlens", "returncode": 0, "stderr": ""}
-        )(),
-    )
+@pytest.mark.usefixtures("json_backend")
+def test_export_and_import(runner, tmp_path, monkeypatch, fake_cli):
+    fake_cli.stdout = b"ms-python.python\neamodio.gitlens"
     monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
     settings = {"editor.fontSize": 14}
     with open(Path(tmp_path, "settings.json"), "w", encoding="utf-8") as f:
@@ -43,24 +40,409 @@ def test_export_and_import(tmp_path, monkeypatch):
     assert "Updated settings" in result.output
 
 
-def test_import_missing_file(monkeypatch):
-    runner = CliRunner()
-    monkeypatch.setattr(builtins, "input", lambda *a, **kw: "1")
-    monkeypatch.setattr("vscode_sync.main.IDE_CHOICE", "code")
-    monkeypatch.setattr("vscode_sync.main.check_cli_tools", lambda: True)
-    result = runner.invoke(app, ["import", "nonexistent.json"])
-    assert result.exit_code != 0
-    assert "not found" in result.output or "No such file" in result.output
+@pytest.mark.usefixtures("fake_cli")
+def test_import_missing_file(capsys):
+    with pytest.raises(typer.Exit) as exc_info:
+        import_("nonexistent.json")
+    assert exc_info.value.exit_code != 0
+    output = capsys.readouterr().out
+    assert "not found" in output or "No such file" in output
 
 
-def test_import_invalid_json(tmp_path, monkeypatch):
-    runner = CliRunner()
-    monkeypatch.setattr(builtins, "input", lambda *a, **kw: "1")
-    monkeypatch.setattr("vscode_sync.main.IDE_CHOICE", "code")
-    monkeypatch.setattr("vscode_sync.main.check_cli_tools", lambda: True)
+@pytest.mark.usefixtures("fake_cli")
+def test_import_invalid_json(tmp_path, capsys):
     bad_json = tmp_path / "bad.json"
     with open(bad_json, "w", encoding="utf-8") as f:
         f.write("not a json")
-    result = runner.invoke(app, ["import", str(bad_json)])
+    with pytest.raises(typer.Exit) as exc_info:
+        import_(str(bad_json))
+    assert exc_info.value.exit_code != 0
+    assert "Failed to read input file" in capsys.readouterr().out
+
+
+def test_status_uses_single_cli_call(runner, tmp_path, monkeypatch, fake_cli):
+    fake_cli.stdout = b"ms-python.python\neamodio.gitlens"
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
+    result = runner.invoke(app, ["status"])
+    assert result.exit_code == 0
+    assert "code CLI: Found" in result.output
+    assert "Extensions installed: 2" in result.output
+    assert fake_cli.calls == [["code", "--list-extensions"]]
+
+
+def test_status_probes_cli_when_listing_from_extensions_json(runner, tmp_path, monkeypatch, fake_cli):
+    manifest = [{"identifier": {"id": "ms-python.python"}}]
+    (tmp_path / "extensions.json").write_text(json.dumps(manifest), encoding="utf-8")
+    monkeypatch.setattr("vscode_sync.config.get_extensions_dir", lambda ide: tmp_path)
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: None)
+    result = runner.invoke(app, ["status"])
+    assert "code CLI: Found" in result.output
+    assert "Extensions installed: 1" in result.output
+    fake_cli.returncode = 1
+    result = runner.invoke(app, ["status"])
+    assert result.exit_code == 0
+    assert "code CLI: Not found" in result.output
+    assert fake_cli.calls == [["code", "--version"], ["code", "--version"]]
+
+
+def test_export_deflates_large_payloads(runner, tmp_path, monkeypatch, fake_cli):
+    fake_cli.stdout = b"ms-python.python"
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
+    settings = {f"custom.setting{i}": "x" * 32 for i in range(2000)}
+    with open(Path(tmp_path, "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    export_zip = tmp_path / "export.zip"
+    result = runner.invoke(app, ["export", str(export_zip), "--output-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    with zipfile.ZipFile(export_zip, "r") as zipf:
+        assert zipf.getinfo("vscode_sync_export.json").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_import_batches_extension_installs(runner, tmp_path, fake_cli):
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"extensions": ["ms-python.python", "eamodio.gitlens", "ms-python.python"]}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings"])
+    assert result.exit_code == 0
+    assert "Installing 2 extensions" in result.output
+    assert fake_cli.calls == [
+        ["code", "--install-extension", "ms-python.python", "--install-extension", "eamodio.gitlens"]
+    ]
+    assert "Installed eamodio.gitlens" in result.output
+
+
+def test_import_skips_malformed_extension_ids(runner, tmp_path, fake_cli):
+    import_json = tmp_path / "import.json"
+    extensions = ["ms-python.python", 'x" & calc & "', "eamodio.gitlens@14.0.0", "no-publisher", 42]
+    import_json.write_text(json.dumps({"extensions": extensions}), encoding="utf-8")
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings"])
+    assert result.exit_code == 0
+    assert "Skipping invalid extension ID 'x\" & calc & \"'." in result.output
+    assert "Skipping invalid extension ID 'no-publisher'." in result.output
+    assert "Skipping invalid extension ID 42." in result.output
+    assert fake_cli.calls == [
+        ["code", "--install-extension", "ms-python.python", "--install-extension", "eamodio.gitlens@14.0.0"]
+    ]
+
+
+def test_import_rejects_non_list_extensions(runner, tmp_path, fake_cli):
+    import_json = tmp_path / "import.json"
+    import_json.write_text(json.dumps({"extensions": "ms-python.python"}), encoding="utf-8")
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings"])
+    assert result.exit_code == 0
+    assert "'extensions' must be a list" in result.output
+    assert "Skipping invalid extension ID" not in result.output
+    assert not fake_cli.calls
+
+
+def test_import_retries_failed_batch_per_extension(runner, tmp_path, fake_cli):
+    fake_cli.stderr = b"not found"
+    fake_cli.respond = lambda argv: 0 if argv == ["code", "--install-extension", "ms-python.python"] else 1
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"extensions": ["ms-python.python", "bogus.ext"]}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings", "--jobs", "1"])
+    assert result.exit_code == 0
+    assert len(fake_cli.calls) == 3
+    output = result.output
+    assert output.index("Installed ms-python.python") < output.index("Failed to install bogus.ext")
+    assert "Failed to install bogus.ext: not found" in result.output
+
+
+def test_import_batch_timeout_falls_back(runner, tmp_path, fake_cli):
+    def respond(argv):
+        if len(argv) > 3:
+            raise subprocess.TimeoutExpired(argv, fake_cli.timeouts[-1])
+        return 0
+
+    fake_cli.respond = respond
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"extensions": ["ms-python.python", "eamodio.gitlens"]}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings"])
+    assert result.exit_code == 0
+    assert fake_cli.timeouts[0] == 2 * INSTALL_TIMEOUT
+    assert len(fake_cli.calls) == 3
+    assert "Installed eamodio.gitlens" in result.output
+
+
+def test_list_extensions_reads_extensions_json(tmp_path, monkeypatch, fake_cli):
+    # pylint: disable=protected-access
+    # Folders of other profiles and stale versions share the directory but are not in extensions.json.
+    for name in ["ms-python.python-2024.2.1", "dart-code.flutter-3.80.0", "other.profile-only-1.0.0"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "package.json").write_text("{}", encoding="utf-8")
+    manifest = [
+        {"identifier": {"id": "ms-python.python"}, "version": "2024.2.1"},
+        {"identifier": {"id": "Dart-Code.flutter"}, "version": "3.80.0"},
+        {"identifier": {"id": "ms-python.python"}, "version": "2024.0.0"},
+        {"identifier": "broken"},
+    ]
+    (tmp_path / "extensions.json").write_text(json.dumps(manifest), encoding="utf-8")
+    monkeypatch.setattr("vscode_sync.config.get_extensions_dir", lambda ide: tmp_path)
+    assert main._list_extensions() == ["Dart-Code.flutter", "ms-python.python"]
+    assert not fake_cli.calls
+    (tmp_path / "extensions.json").unlink()
+    fake_cli.stdout = b"ms-python.python"
+    assert main._list_extensions() == ["ms-python.python"]
+    assert fake_cli.calls == [["code", "--list-extensions"]]
+
+
+def test_import_replaces_settings_atomically(runner, tmp_path, monkeypatch, fake_cli):
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text('{"editor.fontSize": 12}', encoding="utf-8")
+    settings_path.chmod(0o644)
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"settings": {"editor.fontSize": 14}}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-extensions", "--no-backup"])
+    assert result.exit_code == 0
+    assert json.loads(settings_path.read_text(encoding="utf-8")) == {"editor.fontSize": 14}
+    assert settings_path.stat().st_mode & 0o777 == 0o644
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["import.json", "settings.json"]
+    assert not fake_cli.calls
+
+
+def test_write_atomic_writes_through_symlink(tmp_path):
+    # pylint: disable=protected-access
+    target = tmp_path / "dotfiles" / "settings.json"
+    target.parent.mkdir()
+    target.write_text("{}", encoding="utf-8")
+    target.chmod(0o640)
+    link = tmp_path / "settings.json"
+    link.symlink_to(target)
+    main._write_atomic(link, b'{"editor.fontSize": 14}')
+    assert link.is_symlink()
+    assert target.read_bytes() == b'{"editor.fontSize": 14}'
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert sorted(p.name for p in target.parent.iterdir()) == ["settings.json"]
+
+
+def test_write_atomic_new_file_follows_umask(tmp_path):
+    # pylint: disable=protected-access
+    old_umask = os.umask(0o022)
+    try:
+        main._write_atomic(tmp_path / "settings.json", b"{}")
+    finally:
+        os.umask(old_umask)
+    assert (tmp_path / "settings.json").stat().st_mode & 0o777 == 0o644
+
+
+def test_list_extensions_parses_cli_output(fake_cli):
+    # pylint: disable=protected-access
+    fake_cli.stdout = b"\r\nms-python.python\r\n\r\neamodio.gitlens\n"
+    assert main._list_extensions() == ["ms-python.python", "eamodio.gitlens"]
+
+
+def test_import_backup_keeps_old_settings(runner, tmp_path, monkeypatch, fake_cli):
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
+    settings_path = tmp_path / "settings.json"
+    backup_path = tmp_path / "settings.backup.json"
+    backup_path.write_text("stale", encoding="utf-8")
+    settings_path.write_text('{"editor.fontSize": 12}', encoding="utf-8")
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"settings": {"editor.fontSize": 14}}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-extensions"])
+    assert result.exit_code == 0
+    assert "Backed up current settings" in result.output
+    assert json.loads(backup_path.read_text(encoding="utf-8")) == {"editor.fontSize": 12}
+    assert json.loads(settings_path.read_text(encoding="utf-8")) == {"editor.fontSize": 14}
+    assert not fake_cli.calls
+
+
+def test_import_backup_is_a_snapshot_of_symlinked_settings(runner, tmp_path, monkeypatch, fake_cli):
+    target = tmp_path / "dotfiles" / "settings.json"
+    target.parent.mkdir()
+    target.write_text('{"editor.fontSize": 12}', encoding="utf-8")
+    settings_path = tmp_path / "settings.json"
+    settings_path.symlink_to(target)
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: settings_path)
+    import_json = tmp_path / "import.json"
+    import_json.write_text(json.dumps({"settings": {"editor.fontSize": 14}}), encoding="utf-8")
+    result = runner.invoke(app, ["import", str(import_json), "--no-extensions"])
+    assert result.exit_code == 0
+    backup_path = tmp_path / "settings.backup.json"
+    assert not backup_path.is_symlink()
+    assert not os.path.samefile(backup_path, target)
+    target.write_text('{"editor.fontSize": 16}', encoding="utf-8")
+    assert json.loads(backup_path.read_text(encoding="utf-8")) == {"editor.fontSize": 12}
+    assert not fake_cli.calls
+
+
+def test_import_from_export_zip(runner, tmp_path, fake_cli):
+    export_zip = tmp_path / "export.zip"
+    with zipfile.ZipFile(export_zip, "w") as zipf:
+        zipf.writestr("vscode_sync_export.json", json.dumps({"extensions": ["ms-python.python"]}))
+    result = runner.invoke(app, ["import", str(export_zip), "--no-settings"])
+    assert result.exit_code == 0
+    assert fake_cli.calls == [["code", "--install-extension", "ms-python.python"]]
+
+
+@pytest.mark.usefixtures("fake_cli")
+def test_import_zip_without_export_member(runner, tmp_path):
+    export_zip = tmp_path / "other.zip"
+    with zipfile.ZipFile(export_zip, "w") as zipf:
+        zipf.writestr("something_else.json", "{}")
+    result = runner.invoke(app, ["import", str(export_zip)])
     assert result.exit_code != 0
     assert "Failed to read input file" in result.output
+
+
+def test_cli_path_lookups_are_cached(monkeypatch):
+    # pylint: disable=protected-access
+    lookups = []
+
+    def fake_which(name):
+        lookups.append(name)
+        return f"/usr/local/bin/{name}"
+
+    monkeypatch.setattr("vscode_sync.main.shutil.which", fake_which)
+    monkeypatch.setattr("vscode_sync.main.IDE_CHOICE", "code")
+    assert main.check_cli_tools()
+    assert main._ide_cli() == "/usr/local/bin/code"
+    assert lookups == ["code"]
+
+
+def test_run_captures_raw_bytes():
+    # pylint: disable=protected-access
+    result = main._run([sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"])
+    assert result.returncode == 0
+    assert result.stdout.strip() == b"out"
+    assert result.stderr.strip() == b"err"
+
+
+def test_check_cli_tools_validates_once(monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr("vscode_sync.main.shutil.which", lambda name: f"/usr/local/bin/{name}")
+    monkeypatch.setattr("vscode_sync.main.IDE_CHOICE", "code")
+    assert main.check_cli_tools()
+    main._reset_cli_cache()
+    monkeypatch.setattr("vscode_sync.main.shutil.which", lambda name: None)
+    assert main.check_cli_tools()
+    main._reset_cli_validated()
+    with pytest.raises(typer.Exit):
+        main.check_cli_tools()
+
+
+def test_import_reports_already_installed_extensions(runner, tmp_path, fake_cli):
+    fake_cli.stdout = (
+        b"Installing extensions...\n"
+        b"Extension 'ms-python.python' v2024.2.1 was successfully installed.\n"
+        b"Extension 'eamodio.gitlens' is already installed.\n"
+    )
+    import_json = tmp_path / "import.json"
+    with open(import_json, "w", encoding="utf-8") as f:
+        json.dump({"extensions": ["ms-python.python", "eamodio.gitlens"]}, f)
+    result = runner.invoke(app, ["import", str(import_json), "--no-settings"])
+    assert result.exit_code == 0
+    assert "  Installed ms-python.python" in result.output
+    assert "  Already installed eamodio.gitlens" in result.output
+
+
+@pytest.mark.usefixtures("fake_cli")
+def test_list_repos_reads_recent_git_folders(runner, tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / ".git").mkdir(parents=True)
+    worktree = tmp_path / "worktree"
+    worktree.mkdir()
+    (worktree / ".git").write_text("gitdir: ../repo/.git/worktrees/wt", encoding="utf-8")
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    not_a_dir = tmp_path / "file.txt"
+    not_a_dir.write_text("", encoding="utf-8")
+    storage = tmp_path / ".config/Code/User/globalStorage/storage.json"
+    storage.parent.mkdir(parents=True)
+    (tmp_path / ".config/Code/storage.json").write_text(
+        json.dumps({"openedPathsList": {"entries": [str(worktree), str(repo)]}}), encoding="utf-8"
+    )
+    storage.write_text(
+        json.dumps(
+            {
+                "openedPathsList": {
+                    "workspaces3": [str(repo), {"folderUri": "file:///elsewhere"}],
+                    "entries": [str(plain), str(tmp_path / "gone"), str(not_a_dir), str(worktree)],
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr("vscode_sync.config.get_os", lambda: "linux")
+    result = runner.invoke(app, ["list-repos"])
+    assert result.exit_code == 0
+    assert result.output.endswith(f"Recent Git repositories:\n- {repo}\n- {worktree}\n")
+    assert str(plain) not in result.output
+    assert str(not_a_dir) not in result.output
+
+
+def test_parse_storage_flattens_opened_paths(tmp_path):
+    # pylint: disable=protected-access
+    storage = tmp_path / "storage.json"
+    storage.write_text(
+        json.dumps({"openedPathsList": {"workspaces3": ["/b"], "entries": ["/a"]}}), encoding="utf-8"
+    )
+    assert main._parse_storage(storage) == ("/b", "/a")
+    storage.write_text("{}", encoding="utf-8")
+    assert main._parse_storage(storage) == ()
+
+
+@pytest.mark.usefixtures("fake_cli")
+def test_wizard_edits_preset_extensions(runner):
+    answers = [
+        "9",
+        "5",
+        "y",
+        "add",
+        "eamodio.gitlens",
+        "add",
+        "eamodio.gitlens",
+        "bogus",
+        "remove",
+        "Dart-Code.flutter",
+        "done",
+        "n",
+        "n",
+    ]
+    result = runner.invoke(app, ["wizard"], input="\n".join(answers) + "\n")
+    assert result.exit_code == 0
+    assert result.output.count("Added eamodio.gitlens.") == 1
+    assert "Removed Dart-Code.flutter." in result.output
+    assert result.output.count("Please enter one of:") == 2
+    expected = ["Dart-Code.dart-code", "msjsdiag.debugger-for-chrome", "eamodio.gitlens"]
+    assert f"Extensions: {expected}" in result.output
+    assert "Aborted. No changes made." in result.output
+
+
+def test_export_writes_zip_only(runner, tmp_path, monkeypatch, fake_cli):
+    monkeypatch.chdir(tmp_path)
+    fake_cli.stdout = b"ms-python.python"
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: None)
+    result = runner.invoke(app, ["export", "export.zip"])
+    assert result.exit_code == 0
+    assert [p.name for p in tmp_path.iterdir()] == ["export.zip"]
+    with zipfile.ZipFile(tmp_path / "export.zip", "r") as zipf:
+        payload = zipf.read("vscode_sync_export.json")
+    assert json.loads(payload)["extensions"] == ["ms-python.python"]
+    assert b"\n " not in payload
+    result = runner.invoke(app, ["export", "pretty.zip", "--pretty"])
+    assert result.exit_code == 0
+    with zipfile.ZipFile(tmp_path / "pretty.zip", "r") as zipf:
+        assert b'\n  "extensions": [' in zipf.read("vscode_sync_export.json")
+
+
+def test_wizard_applies_chosen_configuration(runner, tmp_path, monkeypatch, fake_cli):
+    monkeypatch.setattr("vscode_sync.config.get_vscode_settings_path", lambda: tmp_path / "settings.json")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+    answers = ["5", "n", "n", "y"]
+    result = runner.invoke(app, ["wizard"], input="\n".join(answers) + "\n")
+    assert result.exit_code == 0, result.output
+    assert fake_cli.calls == [
+        ["code", "--install-extension", "Dart-Code.dart-code", "--install-extension", "Dart-Code.flutter"]
+        + ["--install-extension", "msjsdiag.debugger-for-chrome"]
+    ]
+    assert json.loads((tmp_path / "settings.json").read_bytes()) == {"editor.formatOnSave": True}
+    assert not list(scratch.iterdir())
@@ -1,18 +1,25 @@
+from collections.abc import Mapping
+
+import pytest
+
 from vscode_sync import presets
 
 
-def test_presets_structure():
-    assert isinstance(presets.PRESETS, dict)
-    for _, value in presets.PRESETS.items():
+def test_presets_structure_and_content():
+    assert isinstance(presets.PRESETS, Mapping)
+    for value in presets.PRESETS.values():
         assert "extensions" in value
         assert "settings" in value
-        assert isinstance(value["extensions"], list)
-        assert isinstance(value["settings"], dict)
+        assert isinstance(value["extensions"], tuple)
+        assert isinstance(value["settings"], Mapping)
+        assert all(isinstance(ext, str) for ext in value["extensions"])
+        assert all(isinstance(k, str) for k in value["settings"])
 
 
-def test_presets_content():
-    for preset in presets.PRESETS.values():
-        for ext in preset["extensions"]:
-            assert isinstance(ext, str)
-        for k, _ in preset["settings"].items():
-            assert isinstance(k, str)
+def test_presets_are_read_only():
+    with pytest.raises(TypeError):
+        presets.PRESETS["New"] = {}  # type: ignore[index]
+    with pytest.raises(TypeError):
+        presets.PRESETS["Frontend"]["extensions"] = ("x",)  # type: ignore[index]
+    with pytest.raises(TypeError):
+        presets.PRESETS["Frontend"]["settings"]["editor.tabSize"] = 2
@@ -1,11 +1,15 @@
 """Configuration management for VSCode Sync Tool."""
 
+import functools
 import sys
 import os
 from pathlib import Path
 from typing import Optional
 
 
+# The OS and settings path cannot change while the process runs, so both lookups are cached.
+# lru_cache is thread-safe; tests that fake another platform call cache_clear().
+@functools.lru_cache(maxsize=1)
 def get_os() -> str:
     """Detect the current operating system (macos, windows, linux, or unknown)."""
     if sys.platform.startswith("darwin"):
@@ -17,6 +21,7 @@ def get_os() -> str:
     return "unknown"
 
 
+@functools.lru_cache(maxsize=1)
 def get_vscode_settings_path() -> Optional[Path]:
     """Get the path to the VSCode settings.json file for the current OS."""
     os_type = get_os()
@@ -30,3 +35,14 @@ def get_vscode_settings_path() -> Optional[Path]:
     if os_type == "linux":
         return Path.home() / ".config/Code/User/settings.json"
     return None
+
+
+def get_extensions_dir(ide: str) -> Optional[Path]:
+    """Get the directory where the given IDE CLI ('code' or 'cursor') installs extensions."""
+    if ide == "code":
+        # VSCode itself honours this override, e.g. for portable or shared extension folders.
+        override = os.environ.get("VSCODE_EXTENSIONS")
+        return Path(override) if override else Path.home() / ".vscode/extensions"
+    if ide == "cursor":
+        return Path.home() / ".cursor/extensions"
+    return None
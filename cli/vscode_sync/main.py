@@ -1,17 +1,20 @@
 """Main CLI application for VSCode Sync Tool."""
 
+import contextlib
 import json
 import os
+import re
 import shutil
+import stat
 import subprocess
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-import tempfile
-import zipfile
 import typer
 
 
+from . import _json
 from . import config
 from . import presets
 
@@ -19,13 +22,82 @@ app = typer.Typer(help="VSCode Sync Tool: Export, import, and share your VSCode
 
 IDE_CHOICE: Optional[str] = None
 
+# Wizard menu entries: the built-in presets in definition order, then a blank "Custom" setup.
+_PRESET_NAMES = (*presets.PRESETS, "Custom")
+
+# Resolved executable path per CLI name ('code', 'cursor'); None when it is not on PATH.
+_CLI_PATH_CACHE: Dict[str, Optional[str]] = {}
+
+# Set once check_cli_tools has succeeded, so later commands in the same process skip the checks.
+_CLI_VALIDATED = False
+
+# One extension ID per whitespace-separated token of '--list-extensions' output; blank lines never match.
+_CLI_EXTENSION_RE = re.compile(rb"\S+")
+
+# Extension IDs the CLI reports as already present when installing.
+_ALREADY_INSTALLED_RE = re.compile(rb"Extension '([^'\n]+)'[^\n]*already installed", re.IGNORECASE)
+
+# Well-formed "<publisher>.<name>[@<version>]" IDs. Import files are shared between people, and on
+# Windows the CLI is a .cmd script run by cmd.exe, so anything else must never reach its argv.
+_EXTENSION_ID_RE = re.compile(r"[A-Za-z0-9][\w-]*\.[A-Za-z0-9][\w-]*(@[\w.-]+)?", re.ASCII)
+
+# Name of the JSON document inside an export ZIP.
+EXPORT_MEMBER = "vscode_sync_export.json"
+
+# Exports smaller than this are stored uncompressed; deflating them costs more CPU than it saves space.
+ZIP_STORE_THRESHOLD = 64 * 1024
+
+# Per-extension install results are printed in chunks of this many lines.
+INSTALL_ECHO_CHUNK = 10
+
+# Upper bound on threads used to check recent folders for .git.
+GIT_SCAN_WORKERS = 8
+
+# Default number of concurrent per-extension installs; kept low to stay polite to the Marketplace.
+DEFAULT_INSTALL_JOBS = 4
+
+# Seconds allowed per extension install; a batched install gets this budget for each extension in it.
+INSTALL_TIMEOUT = 60
+
+# Answers accepted when the wizard asks how to edit the extension list.
+_WIZARD_ACTIONS = ("add", "remove", "done")
+
+
+def _which(name: str) -> Optional[str]:
+    """shutil.which with a per-process cache, since PATH does not change while a command runs."""
+    if name not in _CLI_PATH_CACHE:
+        _CLI_PATH_CACHE[name] = shutil.which(name)
+    return _CLI_PATH_CACHE[name]
+
+
+def _reset_cli_cache() -> None:
+    """Forget resolved CLI paths, e.g. after a test patches shutil.which."""
+    _CLI_PATH_CACHE.clear()
+
+
+def _reset_cli_validated() -> None:
+    """Make the next check_cli_tools call validate the IDE CLI again."""
+    global _CLI_VALIDATED  # pylint: disable=global-statement
+    _CLI_VALIDATED = False
+
+
+def _run(argv: List[str], timeout: Optional[float] = None) -> "subprocess.CompletedProcess[bytes]":
+    """Run an IDE CLI command, capturing stdout/stderr as raw bytes for the caller to decode once."""
+    return subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False, timeout=timeout)
+
+
+def _ide_cli() -> str:
+    """Return the selected IDE CLI as an absolute path when it is on PATH, so the OS need not search again."""
+    assert IDE_CHOICE is not None
+    return _which(IDE_CHOICE) or IDE_CHOICE
+
 
 def select_ide() -> None:
     """Prompt the user to select which IDE CLI to use (VSCode or Cursor)."""
     # pylint: disable=global-statement
     global IDE_CHOICE
-    vscode_installed = shutil.which("code") is not None
-    cursor_installed = shutil.which("cursor") is not None
+    vscode_installed = _which("code") is not None
+    cursor_installed = _which("cursor") is not None
     if not vscode_installed and not cursor_installed:
         typer.echo("Error: Neither VSCode ('code') nor Cursor ('cursor') CLI is installed.")
         raise typer.Exit(code=1)
@@ -53,9 +125,12 @@ def select_ide() -> None:
 
 def check_cli_tools() -> bool:
     """Check if the selected IDE CLI tool is available in PATH."""
+    global _CLI_VALIDATED  # pylint: disable=global-statement
+    if _CLI_VALIDATED:
+        return True
     if IDE_CHOICE is None:
         select_ide()
-    if IDE_CHOICE is not None and shutil.which(IDE_CHOICE) is None:
+    if IDE_CHOICE is not None and _which(IDE_CHOICE) is None:
         typer.echo(f"Required CLI tool '{IDE_CHOICE}' not found in PATH.")
         if IDE_CHOICE == "code":
             typer.echo("To install the 'code' command:")
@@ -81,35 +156,76 @@ def check_cli_tools() -> bool:
             raise typer.Exit(code=1)
         typer.echo(f"Please install '{IDE_CHOICE}' and try again.")
         raise typer.Exit(code=1)
+    _CLI_VALIDATED = True
     return True
 
 
+def _list_extensions_via_fs() -> Optional[List[str]]:
+    """List the selected IDE's extensions from its extensions.json, or None when that is unavailable."""
+    assert IDE_CHOICE is not None
+    extensions_dir = config.get_extensions_dir(IDE_CHOICE)
+    if extensions_dir is None:
+        return None
+    # The extensions folder is shared by all profiles and keeps stale versions around; extensions.json
+    # lists only the default profile's extensions, with the IDs in their original casing.
+    try:
+        manifest = _json.loads((extensions_dir / "extensions.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, list):
+        return None
+    found = [
+        entry["identifier"]["id"]
+        for entry in manifest
+        if isinstance(entry, dict)
+        and isinstance(entry.get("identifier"), dict)
+        and isinstance(entry["identifier"].get("id"), str)
+    ]
+    return sorted(dict.fromkeys(found), key=str.lower)
+
+
+def _list_extensions_via_cli() -> Optional[List[str]]:
+    """List the selected IDE's extensions with '--list-extensions', or None if the CLI reported an error.
+
+    Raises FileNotFoundError when the CLI executable is missing.
+    """
+    result = _run([_ide_cli(), "--list-extensions"])
+    if result.returncode != 0:
+        return None
+    return [m.decode("utf-8", errors="replace") for m in _CLI_EXTENSION_RE.findall(result.stdout)]
+
+
+def _list_extensions() -> Optional[List[str]]:
+    """Return the extensions installed in the selected IDE, or None if its CLI reported an error.
+
+    Reads the IDE's extensions.json when it exists and only falls back to the CLI otherwise.
+    Raises FileNotFoundError when the CLI is needed but its executable is missing.
+    """
+    extensions = _list_extensions_via_fs()
+    return extensions if extensions is not None else _list_extensions_via_cli()
+
+
 @app.command()
 def status() -> None:
     """Show current VSCode or Cursor status."""
     if not check_cli_tools():
         return
     cli_ok = False
+    extensions: Optional[List[str]] = None
     if IDE_CHOICE is not None:
         try:
-            assert IDE_CHOICE is not None
-            result = subprocess.run([IDE_CHOICE, "--version"], capture_output=True, text=True, check=False)
-            cli_ok = result.returncode == 0
+            extensions = _list_extensions_via_fs()
+            if extensions is None:
+                # A single --list-extensions call both proves the CLI works and yields the extension list.
+                extensions = _list_extensions_via_cli()
+                cli_ok = extensions is not None
+            else:
+                # extensions.json was read without the CLI, so run it once to prove it works.
+                cli_ok = _run([_ide_cli(), "--version"]).returncode == 0
         except FileNotFoundError:
             cli_ok = False
     typer.echo(f"{IDE_CHOICE} CLI: {'Found' if cli_ok else 'Not found'}")
-    extensions: List[str] = []
-    if cli_ok:
-        assert IDE_CHOICE is not None
-        ext_result = subprocess.run(
-            [IDE_CHOICE, "--list-extensions"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if ext_result.returncode == 0:
-            extensions = ext_result.stdout.strip().splitlines()
-    typer.echo(f"Extensions installed: {len(extensions)}")
+    typer.echo(f"Extensions installed: {len(extensions or [])}")
     settings_path = config.get_vscode_settings_path()
     if settings_path and Path(settings_path).exists():
         typer.echo(f"Settings file: {settings_path} (Found)")
@@ -121,21 +237,15 @@ def status() -> None:
 def export(
     output: str = typer.Argument(..., help="Path to the output ZIP file."),
     output_dir: Optional[str] = typer.Option(
-        None, help="Directory to save intermediate files (default: temp dir)."
+        None, help="Directory to save the ZIP file in (default: relative to the current directory)."
     ),
+    pretty: bool = typer.Option(False, "--pretty", help="Indent the exported JSON for human reading."),
 ) -> None:
     """Export configuration to a ZIP file (JSON only, assumes all extensions are from the Marketplace)."""
     if not check_cli_tools():
         return
     try:
-        assert IDE_CHOICE is not None
-        ext_result = subprocess.run(
-            [IDE_CHOICE, "--list-extensions"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        extensions = ext_result.stdout.strip().splitlines() if ext_result.returncode == 0 else []
+        extensions = _list_extensions() or []
     except FileNotFoundError:
         typer.echo(f"{IDE_CHOICE} CLI not found. Cannot export extensions.")
         return
@@ -143,43 +253,141 @@ def export(
     settings: Dict[str, Any] = {}
     if settings_path and Path(settings_path).exists():
         try:
-            with open(settings_path, "r", encoding="utf-8") as f:
-                settings = json.load(f)
+            settings = _json.loads(Path(settings_path).read_bytes())
         except (OSError, json.JSONDecodeError) as e:
             typer.echo(f"Failed to read settings: {e}")
     if output_dir:
-        out_dir = Path(output_dir)
-        out_dir.mkdir(parents=True, exist_ok=True)
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        output_final = Path(output_dir, output)
     else:
-        out_dir = Path(tempfile.mkdtemp())
+        output_final = Path(output)
     data = {
         "metadata": {
-            "created_at": __import__("datetime").datetime.now().isoformat(timespec="seconds"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
             "system": config.get_os().capitalize(),
             "vscode_sync_version": "0.1.0",
         },
         "extensions": extensions,
         "settings": settings,
     }
-    json_path = Path(out_dir, "vscode_sync_export.json")
+    # zipfile pulls in the compression modules; only export needs it, so keep it off the startup path.
+    import zipfile  # pylint: disable=import-outside-toplevel
+
     try:
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except (OSError, json.JSONDecodeError) as e:
+        # The export is read back by `import`, so it is compact unless asked otherwise.
+        payload = _json.dumps(data, pretty=pretty)
+        compression = zipfile.ZIP_STORED if len(payload) < ZIP_STORE_THRESHOLD else zipfile.ZIP_DEFLATED
+        # Serialize straight into the archive; no intermediate JSON file on disk.
+        with zipfile.ZipFile(output_final, "w", compression=compression, compresslevel=1) as zipf:
+            zipf.writestr(EXPORT_MEMBER, payload)
+    except (OSError, TypeError) as e:
         typer.echo(f"Failed to write export file: {e}")
         return
-    output_final = Path(out_dir, output)
-    with zipfile.ZipFile(output_final, "w") as zipf:
-        zipf.write(json_path, arcname="vscode_sync_export.json")
     typer.echo(f"Exported configuration to {output_final}")
 
 
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Replace path with data in one step, so a crash never leaves a half-written file behind."""
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    # Replace the file a symlink points to (e.g. one managed by a dotfiles tool), not the link itself.
+    path = Path(os.path.realpath(path))
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if path.exists():
+            mode = stat.S_IMODE(path.stat().st_mode)
+        else:
+            # mkstemp creates 0600 files; a new file gets the mode open() would have given it.
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def _install_one(ext: str) -> Tuple[str, bool, str]:
+    """Install a single extension, returning (extension, succeeded, stderr)."""
+    assert IDE_CHOICE is not None
+    try:
+        result = _run([_ide_cli(), "--install-extension", ext], timeout=INSTALL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return ext, False, f"timed out after {INSTALL_TIMEOUT}s"
+    if result.returncode == 0:
+        return ext, True, ""
+    return ext, False, result.stderr.decode("utf-8", errors="replace").strip()
+
+
+def _install_extensions(extensions: List[str], jobs: int = DEFAULT_INSTALL_JOBS) -> None:
+    """Install extensions with a single IDE CLI call, retrying one by one if the batch fails."""
+    assert IDE_CHOICE is not None
+    argv = [_ide_cli()]
+    for ext in extensions:
+        argv += ["--install-extension", ext]
+    try:
+        result = _run(argv, timeout=INSTALL_TIMEOUT * len(extensions))
+        batch_ok = result.returncode == 0
+    except subprocess.TimeoutExpired:
+        batch_ok = False
+    if batch_ok:
+        # The CLI prints one status line per extension, e.g. "Extension 'x.y' is already installed."
+        already = {
+            m.decode("utf-8", errors="replace").lower() for m in _ALREADY_INSTALLED_RE.findall(result.stdout)
+        }
+        typer.echo(
+            "\n".join(
+                f"  Already installed {ext}" if ext.lower() in already else f"  Installed {ext}"
+                for ext in extensions
+            )
+        )
+        return
+    # A failed batch does not say which extension broke, so fall back to per-extension installs.
+    # Each install mostly waits on the Marketplace, so run them concurrently.
+    typer.echo("Retrying extensions individually...")
+    # Only this fallback needs a thread pool; concurrent.futures is slow to import (it loads logging).
+    from concurrent.futures import ThreadPoolExecutor, as_completed  # pylint: disable=import-outside-toplevel
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(extensions)))) as executor:
+        futures = [executor.submit(_install_one, ext) for ext in extensions]
+        # Print in chunks rather than per extension; each echo is a console write (slow on Windows).
+        lines: List[str] = []
+        for future in as_completed(futures):
+            ext, ok, stderr = future.result()
+            lines.append(f"  Installed {ext}" if ok else f"  Failed to install {ext}: {stderr}")
+            if len(lines) >= INSTALL_ECHO_CHUNK:
+                typer.echo("\n".join(lines))
+                lines.clear()
+        if lines:
+            typer.echo("\n".join(lines))
+
+
+def _read_import_file(path: Path) -> Any:
+    """Load a configuration from a JSON file or from a ZIP archive produced by export."""
+    if path.suffix.lower() == ".zip":
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        # Parse the member straight from the archive stream; no extraction to disk and no str decode.
+        with zipfile.ZipFile(path) as zipf, zipf.open(EXPORT_MEMBER) as member:
+            return _json.loads(member.read())
+    return _json.loads(path.read_bytes())
+
+
 @app.command(name="import")
 def import_(
     input_file: str,
     no_extensions: bool = typer.Option(False, help="Do not install extensions."),
     no_settings: bool = typer.Option(False, help="Do not update settings."),
     no_backup: bool = typer.Option(False, help="Do not backup current settings."),
+    jobs: int = typer.Option(
+        DEFAULT_INSTALL_JOBS,
+        min=1,
+        help="Parallel installs when extensions must be installed one by one (1 = sequential).",
+    ),
 ) -> None:
     """Import configuration from a file (JSON or ZIP)."""
     if not check_cli_tools():
@@ -188,28 +396,26 @@ def import_(
         typer.echo(f"Input file '{input_file}' not found.")
         raise typer.Exit(code=1)
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _read_import_file(Path(input_file))
     except Exception as e:
         typer.echo(f"Failed to read input file: {e}")
         raise typer.Exit(code=1)
     if not no_extensions:
-        extensions = data.get("extensions", [])
+        requested = data.get("extensions", [])
+        if not isinstance(requested, list):
+            typer.echo("Skipping extensions: 'extensions' must be a list of extension IDs.")
+            requested = []
+        extensions: List[str] = []
+        for ext in requested:
+            if isinstance(ext, str) and _EXTENSION_ID_RE.fullmatch(ext):
+                extensions.append(ext)
+            else:
+                typer.echo(f"Skipping invalid extension ID {ext!r}.")
+        # Drop duplicate IDs (e.g. from hand-merged exports) while keeping the original order.
+        extensions = list(dict.fromkeys(extensions))
         if extensions:
             typer.echo(f"Installing {len(extensions)} extensions...")
-            for ext in extensions:
-                typer.echo(f"Installing {ext}...")
-                assert IDE_CHOICE is not None
-                result = subprocess.run(
-                    [IDE_CHOICE, "--install-extension", ext],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-                if result.returncode == 0:
-                    typer.echo(f"  Installed {ext}")
-                else:
-                    typer.echo(f"  Failed to install {ext}: {result.stderr.strip()}")
+            _install_extensions(extensions, jobs)
         else:
             typer.echo("No extensions to install.")
     else:
@@ -222,34 +428,45 @@ def import_(
             raise typer.Exit(code=1)
         if not no_backup and settings_path.exists():
             backup_path = settings_path.parent / "settings.backup.json"
+            # Remove the old backup first so copy2 cannot write through it if it is a link.
+            with contextlib.suppress(FileNotFoundError):
+                backup_path.unlink()
             shutil.copy2(settings_path, backup_path)
             typer.echo(f"Backed up current settings to {backup_path}")
         try:
-            with open(settings_path, "w", encoding="utf-8") as f:
-                json.dump(settings, f, indent=2)
+            _write_atomic(settings_path, _json.dumps(settings))
             typer.echo(f"Updated settings at {settings_path}")
-        except (OSError, json.JSONDecodeError) as e:
+        except (OSError, TypeError) as e:
             typer.echo(f"Failed to update settings: {e}")
     else:
         typer.echo("Skipping settings update (--no-settings).")
 
 
+def _one_of(options: Iterable[Any]) -> Callable[[str], str]:
+    """Build a typer.prompt type that accepts only the given options (case-insensitive)."""
+    allowed = tuple(str(option) for option in options)
+
+    def convert(value: str) -> str:
+        answer = value.strip().lower()
+        if answer not in allowed:
+            raise typer.BadParameter(f"Please enter one of: {', '.join(allowed)}.")
+        return answer
+
+    return convert
+
+
 @app.command()
 def wizard() -> None:
     """Interactive setup wizard for environment presets and customization."""
     if not check_cli_tools():
         return
     typer.echo("Welcome to the VSCode Sync Tool Wizard!")
-    preset_names = list(presets.PRESETS.keys()) + ["Custom"]
     typer.echo("Select a development preset:")
-    for idx, name in enumerate(preset_names, 1):
+    for idx, name in enumerate(_PRESET_NAMES, 1):
         typer.echo(f"{idx}. {name}")
-    while True:
-        choice = input(f"Enter 1-{len(preset_names)}: ").strip()
-        if choice.isdigit() and 1 <= int(choice) <= len(preset_names):
-            preset_choice = preset_names[int(choice) - 1]
-            break
-        typer.echo("Invalid choice. Please enter a valid number.")
+    # typer.prompt re-asks on its own whenever the type converter rejects the answer.
+    choice = typer.prompt(f"Enter 1-{len(_PRESET_NAMES)}", type=_one_of(range(1, len(_PRESET_NAMES) + 1)))
+    preset_choice = _PRESET_NAMES[int(choice) - 1]
     if preset_choice == "Custom":
         extensions: List[str] = []
         settings: Dict[str, Any] = {}
@@ -260,22 +477,24 @@ def wizard() -> None:
     for ext in extensions:
         typer.echo(f"  - {ext}")
     if input("Would you like to add/remove extensions? [y/N]: ").strip().lower() == "y":
+        # The list keeps display order; the set answers membership checks in O(1).
+        ext_set = set(extensions)
         while True:
-            action = input("Type 'add', 'remove', or 'done': ").strip().lower()
+            action = typer.prompt("Type 'add', 'remove', or 'done'", type=_one_of(_WIZARD_ACTIONS))
             if action == "add":
                 new_ext = input("Enter extension id to add: ").strip()
-                if new_ext and new_ext not in extensions:
+                if new_ext and new_ext not in ext_set:
                     extensions.append(new_ext)
+                    ext_set.add(new_ext)
                     typer.echo(f"Added {new_ext}.")
             elif action == "remove":
                 rem_ext = input("Enter extension id to remove: ").strip()
-                if rem_ext in extensions:
+                if rem_ext in ext_set:
+                    ext_set.discard(rem_ext)
                     extensions.remove(rem_ext)
                     typer.echo(f"Removed {rem_ext}.")
-            elif action == "done":
-                break
             else:
-                typer.echo("Invalid action.")
+                break
     typer.echo("\nSettings:")
     for k, v in settings.items():
         typer.echo(f"  {k}: {v}")
@@ -297,19 +516,46 @@ def wizard() -> None:
                         value = value_str
             settings[key] = value
             typer.echo(f"Set {key} = {value}")
-    typer.echo("\nSummary:")
-    typer.echo(f"Extensions: {extensions}")
-    typer.echo(f"Settings: {settings}")
+    typer.echo(f"\nSummary:\nExtensions: {extensions}\nSettings: {settings}")
     if input("Apply this configuration? [Y/n]: ").strip().lower() in ["", "y", "yes"]:
-        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp:
-            json.dump({"extensions": extensions, "settings": settings}, tmp, indent=2)
+        import tempfile  # pylint: disable=import-outside-toplevel
+
+        with tempfile.NamedTemporaryFile("wb", delete=False, suffix=".json") as tmp:
+            tmp.write(_json.dumps({"extensions": extensions, "settings": settings}))
             tmp_path = tmp.name
-        import_(__file__, no_extensions=False, no_settings=False, no_backup=False)
-        os.unlink(tmp_path)
+        try:
+            import_(
+                tmp_path, no_extensions=False, no_settings=False, no_backup=False, jobs=DEFAULT_INSTALL_JOBS
+            )
+        finally:
+            os.unlink(tmp_path)
     else:
         typer.echo("Aborted. No changes made.")
 
 
+def _is_git_repo(path: str) -> bool:
+    """Whether path is a folder containing .git (a directory, or a file for worktrees/submodules)."""
+    # A single stat suffices: '<path>/.git' cannot exist unless path is a directory.
+    return os.path.exists(os.path.join(path, ".git"))
+
+
+def _filter_git_repos(paths: List[str]) -> List[str]:
+    """Return the git repositories among paths, preserving order."""
+    if not paths:
+        return []
+    # Recent folders may sit on slow network mounts, so stat them concurrently.
+    from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+
+    with ThreadPoolExecutor(max_workers=min(GIT_SCAN_WORKERS, len(paths))) as executor:
+        return [p for p, is_repo in zip(paths, executor.map(_is_git_repo, paths)) if is_repo]
+
+
+def _parse_storage(path: Path) -> Tuple[Any, ...]:
+    """Parse a storage.json and return its recently opened workspaces and folders."""
+    opened = _json.loads(path.read_bytes()).get("openedPathsList", {})
+    return (*opened.get("workspaces3", []), *opened.get("entries", []))
+
+
 @app.command()
 def list_repos() -> None:
     """List all git repositories in recent workspaces/folders of the selected IDE."""
@@ -338,19 +584,17 @@ def list_repos() -> None:
             recent_json = None
             recent_workspaces = None
         found = False
-        for f in [recent_json, recent_workspaces]:
-            if f and f.exists():
-                try:
-                    with open(f, "r", encoding="utf-8") as file:
-                        data = json.load(file)
-                        paths = data.get("openedPathsList", {}).get("workspaces3", [])
-                        paths += data.get("openedPathsList", {}).get("entries", [])
-                        for p in paths:
-                            if os.path.isdir(p) and os.path.isdir(os.path.join(p, ".git")):
-                                recent_paths.append(p)
-                        found = True
-                except (OSError, json.JSONDecodeError) as e:
-                    typer.echo(f"Failed to parse {f}: {e}")
+        candidates: List[Any] = []
+        for f in (recent_json, recent_workspaces):
+            if not (f and f.exists()):
+                continue
+            try:
+                candidates.extend(_parse_storage(f))
+                found = True
+            except (OSError, json.JSONDecodeError) as e:
+                typer.echo(f"Failed to parse {f}: {e}")
+        # Both files often list the same folder; check and print each one once, in first-seen order.
+        recent_paths = _filter_git_repos(list(dict.fromkeys(p for p in candidates if isinstance(p, str))))
         if not found:
             typer.echo("Could not find or parse recent workspaces/folders for VSCode.")
     elif IDE_CHOICE == "cursor":
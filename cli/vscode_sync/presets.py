@@ -2,70 +2,72 @@
 
 TODO: In the future, obtain these presets dynamically, maybe even using an AI query.
 """
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
-PRESETS: Dict[str, Dict[str, Any]] = {
-    "Frontend": {
-        "extensions": [
+# Read-only views: presets are shared module state, callers copy before customizing.
+PRESETS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "Frontend": MappingProxyType({
+        "extensions": (
             "dbaeumer.vscode-eslint",
             "esbenp.prettier-vscode",
             "msjsdiag.debugger-for-chrome",
             "formulahendry.auto-close-tag",
             "formulahendry.auto-rename-tag",
             "eamodio.gitlens",
-        ],
-        "settings": {
+        ),
+        "settings": MappingProxyType({
             "editor.formatOnSave": True,
             "files.autoSave": "afterDelay",
-        },
-    },
-    "Backend": {
-        "extensions": [
+        }),
+    }),
+    "Backend": MappingProxyType({
+        "extensions": (
             "ms-python.python",
             "ms-python.vscode-pylance",
             "ms-azuretools.vscode-docker",
             "ms-vscode.vscode-typescript-next",
             "eamodio.gitlens",
-        ],
-        "settings": {
+        ),
+        "settings": MappingProxyType({
             "editor.formatOnSave": True,
             "python.linting.enabled": True,
-        },
-    },
-    "Full-stack": {
-        "extensions": [
+        }),
+    }),
+    "Full-stack": MappingProxyType({
+        "extensions": (
             "dbaeumer.vscode-eslint",
             "esbenp.prettier-vscode",
             "ms-python.python",
             "ms-python.vscode-pylance",
             "msjsdiag.debugger-for-chrome",
             "eamodio.gitlens",
-        ],
-        "settings": {
+        ),
+        "settings": MappingProxyType({
             "editor.formatOnSave": True,
-        },
-    },
-    "Data Science": {
-        "extensions": [
+        }),
+    }),
+    "Data Science": MappingProxyType({
+        "extensions": (
             "ms-python.python",
             "ms-toolsai.jupyter",
             "ms-toolsai.jupyter-keymap",
             "ms-toolsai.jupyter-renderers",
             "ms-toolsai.vscode-jupyter-cell-tags",
             "ms-toolsai.vscode-jupyter-slideshow",
-        ],
-        "settings": {
+        ),
+        "settings": MappingProxyType({
             "python.dataScience.sendSelectionToInteractiveWindow": True,
-        },
-    },
-    "Mobile": {
-        "extensions": [
+        }),
+    }),
+    "Mobile": MappingProxyType({
+        "extensions": (
             "Dart-Code.dart-code",
             "Dart-Code.flutter",
             "msjsdiag.debugger-for-chrome",
-        ],
-        "settings": {
+        ),
+        "settings": MappingProxyType({
             "editor.formatOnSave": True,
-        },
-    },
-} 
\ No newline at end of file
+        }),
+    }),
+})